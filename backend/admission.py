@@ -0,0 +1,200 @@
+import logging
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("AdmissionControl")
+
+
+class TokenBucket:
+    """Classic token bucket: refills at ``rate`` tokens/second up to ``burst``."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"Token bucket burst must be at least 1, got {burst}")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now=None):
+        """Take one token. Returns (allowed, seconds until a token is available)."""
+        now = self.clock() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True, 0.0
+        return False, (1.0 - self.tokens) / self.rate
+
+    def refund(self):
+        """Give back a token taken by a request that was rejected elsewhere."""
+        self.tokens = min(self.burst, self.tokens + 1.0)
+
+    def is_full(self, now):
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class TokenRateLimiter:
+    """
+    Per-identity, per-client-address and global token-bucket limits for token issuance.
+
+    Identities are chosen by the client, so the address bucket is what stops a
+    single client cycling through names; the global bucket bounds total load.
+    """
+
+    def __init__(self, identity_rate, identity_burst, global_rate, global_burst,
+                 address_rate=1.0, address_burst=10, max_keys=10000, clock=time.monotonic):
+        # Build one bucket of each keyed kind up front so a bad config fails at startup
+        TokenBucket(identity_rate, identity_burst, clock)
+        TokenBucket(address_rate, address_burst, clock)
+        self.identity_rate = identity_rate
+        self.identity_burst = identity_burst
+        self.address_rate = address_rate
+        self.address_burst = address_burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_burst, clock)
+        self.identity_buckets = {}
+        self.address_buckets = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            identity_rate=float(os.getenv("TOKEN_RATE_PER_IDENTITY", "0.2")),
+            identity_burst=float(os.getenv("TOKEN_BURST_PER_IDENTITY", "3")),
+            address_rate=float(os.getenv("TOKEN_RATE_PER_ADDRESS", "1")),
+            address_burst=float(os.getenv("TOKEN_BURST_PER_ADDRESS", "10")),
+            global_rate=float(os.getenv("TOKEN_RATE_GLOBAL", "20")),
+            global_burst=float(os.getenv("TOKEN_BURST_GLOBAL", "40")),
+        )
+
+    def check(self, identity, address=None):
+        """
+        Admit or reject one token request for ``identity`` from client ``address``.
+
+        Returns:
+            Tuple of (allowed, retry_after_seconds, reason)
+        """
+        with self.lock:
+            now = self.clock()
+            limits = [
+                ("identity", self._bucket(self.identity_buckets, identity, self.identity_rate, self.identity_burst, now)),
+            ]
+            if address is not None:
+                limits.append(
+                    ("address", self._bucket(self.address_buckets, address, self.address_rate, self.address_burst, now))
+                )
+            limits.append(("global", self.global_bucket))
+
+            taken = []
+            for reason, bucket in limits:
+                allowed, retry_after = bucket.try_acquire(now)
+                if not allowed:
+                    # Earlier limits were not at fault, don't charge them for the rejection
+                    for earlier in taken:
+                        earlier.refund()
+                    return False, retry_after, reason
+                taken.append(bucket)
+
+            return True, 0.0, None
+
+    def _bucket(self, buckets, key, rate, burst, now):
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_keys:
+                self._prune(buckets, now)
+            bucket = TokenBucket(rate, burst, self.clock)
+            buckets[key] = bucket
+        return bucket
+
+    def _prune(self, buckets, now):
+        """Drop buckets that have fully refilled; they carry no state."""
+        idle = [key for key, bucket in buckets.items() if bucket.is_full(now)]
+        for key in idle:
+            del buckets[key]
+        logger.debug(f"Pruned {len(idle)} idle buckets")
+
+
+class JobAdmission:
+    """
+    Concurrency cap for the agent worker.
+
+    ``load`` is passed as ``WorkerOptions.load_fnc`` so LiveKit stops
+    dispatching to this worker once it is full, and ``request`` is passed as
+    ``WorkerOptions.request_fnc`` to reject any job that still arrives so it
+    can be dispatched to another worker straight away.
+
+    Slots in use are the worker's running jobs plus jobs we accepted that have
+    not started yet. The worker is picked up from ``load``, which LiveKit calls
+    with it; until then only the accepted jobs are counted.
+    """
+
+    def __init__(self, max_jobs, assign_grace=10.0):
+        self.max_jobs = max(1, int(max_jobs))
+        self.assign_grace = assign_grace
+        self.worker = None
+        # Accepted job ids not yet running -> time accept() returned (None while accepting)
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_jobs=int(os.getenv("AGENT_MAX_JOBS", "8")))
+
+    def _in_use(self, now):
+        """Count running plus pending jobs, dropping pending ones that started or went stale."""
+        running = set()
+        if self.worker is not None:
+            running = {info.job.id for info in self.worker.active_jobs}
+        for job_id, accepted_at in list(self.pending.items()):
+            if job_id in running or (accepted_at is not None and now - accepted_at > self.assign_grace):
+                del self.pending[job_id]
+        return len(running) + len(self.pending)
+
+    def load(self, worker=None):
+        """Report worker load in [0, 1] as the fraction of job slots in use."""
+        with self.lock:
+            if worker is not None:
+                self.worker = worker
+            return min(1.0, self._in_use(time.monotonic()) / self.max_jobs)
+
+    def try_admit(self, job_id):
+        """Reserve a slot for ``job_id``; returns (admitted, slots in use)."""
+        with self.lock:
+            in_use = self._in_use(time.monotonic())
+            if in_use >= self.max_jobs:
+                return False, in_use
+            self.pending[job_id] = None
+            return True, in_use + 1
+
+    async def request(self, req):
+        """Accept the job if a slot is free, otherwise reject it immediately."""
+        admitted, in_use = self.try_admit(req.id)
+        if not admitted:
+            logger.warning(f"Rejecting job {req.id}: {in_use}/{self.max_jobs} jobs active")
+            await req.reject()
+            return
+
+        try:
+            await req.accept()
+        except Exception:
+            with self.lock:
+                self.pending.pop(req.id, None)
+            raise
+
+        with self.lock:
+            if req.id in self.pending:
+                self.pending[req.id] = time.monotonic()
@@ -12,37 +12,47 @@ from livekit.agents.multimodal import MultimodalAgent
 from livekit.plugins import openai
 from dotenv import load_dotenv
 from api import AssistantFnc
+from admission import JobAdmission
+from session_context import SessionContextBuilder
 from prompts import WELCOME_MESSAGE,INSTRUCTION
+import asyncio
 import logging
 import os
 
 logger =logging.getLogger("AI-Agent")
 logger.setLevel(logging.INFO)
 load_dotenv()
+job_admission = JobAdmission.from_env()
 
 async def entrypoint(ctx: JobContext):
     logging.basicConfig(level=logging.INFO)
     logger.info("Starting entrypoint")
     await ctx.connect(auto_subscribe= AutoSubscribe.SUBSCRIBE_ALL)
-    await ctx.wait_for_participant()
+    participant = await ctx.wait_for_participant()
+
+    assistant_fnc = AssistantFnc()
+    builder = SessionContextBuilder(assistant_fnc.db)
+    # The DB queries are blocking; keep them off the job's event loop
+    session_context = await asyncio.to_thread(builder.build, participant.identity, INSTRUCTION, WELCOME_MESSAGE)
 
     model = openai.realtime.RealtimeModel(
-        instructions="INSTRUCTION",
+        instructions=session_context.instructions,
         voice="shimmer",
         temperature=0.8,
         modalities=["audio", "text"],
     )
-    assistant_fnc = AssistantFnc()
     assistant = MultimodalAgent(model=model, fnc_ctx=assistant_fnc)
     assistant.start(ctx.room)
     session = model.sessions[0]
-    session.conversation.item.create(
-        llm.ChatMessage(
-            role="assistant",
-            content = WELCOME_MESSAGE
-        )
-    )
+    # Seeded history followed by WELCOME_MESSAGE
+    for role, content in session_context.messages:
+        session.conversation.item.create(llm.ChatMessage(role=role, content=content))
     session.response.create()
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        request_fnc=job_admission.request,
+        load_fnc=job_admission.load,
+        load_threshold=float(os.getenv("AGENT_LOAD_THRESHOLD", "1.0")),
+    ))
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import List, Dict, Optional, Any, Literal
 from datetime import datetime
 from db_driver import AssistantDatabaseDriver
+from single_flight import SingleFlight
 from livekit.agents import llm
 import logging
 
@@ -14,6 +15,8 @@ class AssistantFnc:
     def __init__(self):
         """Initialize the Assistant Function context with database driver."""
         self.db = AssistantDatabaseDriver()
+        # Identical concurrent read calls share one in-flight DB query
+        self.reads = SingleFlight()
         logger.info("AssistantFnc initialized with database connection")
 
         for name in dir(self):
@@ -32,7 +35,7 @@ class AssistantFnc:
         Returns:
             Dictionary containing user profile data including preferences and last interaction
         """
-        user = self.db.get_user(user_id)
+        user = self.reads.do(("get_user_profile", user_id), lambda: self.db.get_user(user_id))
         if not user:
             return {"error": "User not found"}
         return user
@@ -55,7 +58,8 @@ class AssistantFnc:
         Returns:
             Updated user profile information
         """
-        return self.db.create_or_update_user(user_id, name, preferences)
+        with self.reads.fence():
+            return self.db.create_or_update_user(user_id, name, preferences)
 
     @llm.ai_callable()
     def save_conversation(
@@ -78,7 +82,8 @@ class AssistantFnc:
             True if successful
         """
         try:
-            self.db.save_conversation(user_id, query, response, context)
+            with self.reads.fence():
+                self.db.save_conversation(user_id, query, response, context)
             return True
         except Exception as e:
             logger.error(f"Failed to save conversation: {e}")
@@ -100,7 +105,10 @@ class AssistantFnc:
         Returns:
             List of conversation records ordered by most recent first
         """
-        return self.db.get_recent_conversations(user_id, limit)
+        return self.reads.do(
+            ("get_recent_conversations", user_id, limit),
+            lambda: self.db.get_recent_conversations(user_id, limit)
+        )
 
     @llm.ai_callable()
     def add_task(
@@ -134,7 +142,8 @@ class AssistantFnc:
             except ValueError:
                 logger.warning(f"Invalid date format for {due_date}, using None")
 
-        return self.db.add_task(user_id, title, description, parsed_due_date, priority, category)
+        with self.reads.fence():
+            return self.db.add_task(user_id, title, description, parsed_due_date, priority, category)
 
     @llm.ai_callable()
     def get_pending_tasks(
@@ -152,7 +161,10 @@ class AssistantFnc:
         Returns:
             List of pending task records
         """
-        return self.db.get_pending_tasks(user_id, category)
+        return self.reads.do(
+            ("get_pending_tasks", user_id, category),
+            lambda: self.db.get_pending_tasks(user_id, category)
+        )
 
     @llm.ai_callable()
     def complete_task(self, task_id: int) -> bool:
@@ -165,7 +177,8 @@ class AssistantFnc:
         Returns:
             True if task was successfully marked as completed
         """
-        return self.db.complete_task(task_id)
+        with self.reads.fence():
+            return self.db.complete_task(task_id)
 
     @llm.ai_callable()
     def add_contact(
@@ -191,7 +204,8 @@ class AssistantFnc:
         Returns:
             ID of the created contact
         """
-        return self.db.add_contact(user_id, name, phone, email, relationship, notes)
+        with self.reads.fence():
+            return self.db.add_contact(user_id, name, phone, email, relationship, notes)
 
     @llm.ai_callable()
     def get_contacts(
@@ -209,7 +223,10 @@ class AssistantFnc:
         Returns:
             List of contact records
         """
-        return self.db.get_contacts(user_id, name_filter)
+        return self.reads.do(
+            ("get_contacts", user_id, name_filter),
+            lambda: self.db.get_contacts(user_id, name_filter)
+        )
 
     @llm.ai_callable()
     def update_user_settings(
@@ -230,7 +247,8 @@ class AssistantFnc:
             True if settings were successfully updated
         """
         try:
-            self.db.update_user_settings(user_id, setting_type, settings)
+            with self.reads.fence():
+                self.db.update_user_settings(user_id, setting_type, settings)
             return True
         except Exception as e:
             logger.error(f"Failed to update user settings: {e}")
@@ -247,7 +265,7 @@ class AssistantFnc:
         Returns:
             Dictionary containing all user settings
         """
-        settings = self.db.get_user_settings(user_id)
+        settings = self.reads.do(("get_user_settings", user_id), lambda: self.db.get_user_settings(user_id))
         if not settings:
             return {"error": "Settings not found"}
         return settings
@@ -264,17 +282,22 @@ class AssistantFnc:
             Dictionary containing summary information about tasks, contacts, and recent interactions
         """
         try:
-            user = self.db.get_user(user_id)
-            pending_tasks = self.db.get_pending_tasks(user_id)
-            recent_convos = self.db.get_recent_conversations(user_id, 3)
-
-            return {
-                "user_name": user.get("name") if user else "User",
-                "last_interaction": user.get("last_interaction") if user else None,
-                "pending_task_count": len(pending_tasks),
-                "upcoming_tasks": [t for t in pending_tasks if t.get("due_date") is not None][:3],
-                "recent_interactions": recent_convos
-            }
+            return self.reads.do(("generate_summary", user_id), lambda: self._build_summary(user_id))
         except Exception as e:
             logger.error(f"Failed to generate summary: {e}")
             return {"error": f"Failed to generate summary: {str(e)}"}
+
+    def _build_summary(self, user_id: str) -> Dict[str, Any]:
+        user = self.db.get_user(user_id)
+        pending_tasks = self.db.get_pending_tasks(user_id)
+        recent_convos = self.db.get_recent_conversations(user_id, 3)
+
+        return {
+            "user_name": user.get("name") if user else "User",
+            "last_interaction": user.get("last_interaction") if user else None,
+            "pending_task_count": len(pending_tasks),
+            "upcoming_tasks": sorted(
+                [t for t in pending_tasks if t.get("due_date") is not None], key=lambda t: t["due_date"]
+            )[:3],
+            "recent_interactions": recent_convos
+        }
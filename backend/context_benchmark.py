@@ -0,0 +1,110 @@
+"""
+Benchmark tokens per session as a user's history grows.
+
+Builds the session context for simulated users with increasingly long
+histories and compares it with seeding the whole history unbounded:
+
+    python context_benchmark.py --sizes 10 100 1000 10000 --budget 2000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from prompts import INSTRUCTION, WELCOME_MESSAGE
+from session_context import SessionContextBuilder, estimate_tokens
+
+TASK_PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+WORDS = ("remind me to call the dentist about the appointment next week and check the "
+         "project deadline for the backend migration then summarize my notes from today").split()
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+class SimulatedHistory:
+    """In-memory stand-in for AssistantDatabaseDriver holding a generated history."""
+
+    def __init__(self, conversations, tasks, seed=0):
+        rng = random.Random(seed)
+        start = datetime(2024, 1, 1)
+        self.user = {
+            "user_id": "bench-user",
+            "name": "Bench User",
+            "preferences": {"language": "en", "units": "metric"},
+            "last_interaction": start + timedelta(minutes=conversations),
+        }
+        self.settings = {
+            "user_id": "bench-user",
+            "voice_settings": {"voice": "shimmer", "speed": 1.0},
+            "notification_preferences": {"email": True},
+            "privacy_settings": {},
+        }
+        self.conversations = [
+            {
+                "timestamp": start + timedelta(minutes=i),
+                "query": sentence(rng, 5, 30),
+                "response": sentence(rng, 20, 120),
+                "context": {},
+            }
+            for i in range(conversations)
+        ]
+        self.conversations.reverse()
+        self.tasks = [
+            {
+                "id": i,
+                "title": sentence(rng, 2, 6),
+                "description": sentence(rng, 0, 40),
+                "due_date": start + timedelta(days=i),
+                "priority": rng.choice(["low", "medium", "high"]),
+                "category": None,
+            }
+            for i in range(tasks)
+        ]
+        # Ordered the way get_pending_tasks orders in SQL
+        self.tasks_by_priority = sorted(
+            self.tasks, key=lambda t: (TASK_PRIORITY_RANK.get(t["priority"], 1), t["due_date"])
+        )
+
+    def get_user(self, user_id):
+        return self.user
+
+    def get_user_settings(self, user_id):
+        return self.settings
+
+    def get_pending_tasks(self, user_id, category=None, limit=None):
+        return self.tasks_by_priority[:limit]
+
+    def get_recent_conversations(self, user_id, limit=5):
+        return self.conversations[:limit]
+
+
+def unbounded_tokens(db):
+    """Tokens if the full profile, settings, tasks and history were all sent to the model."""
+    payload = [db.user, db.settings, db.tasks, db.conversations]
+    fixed = estimate_tokens(INSTRUCTION) + estimate_tokens(WELCOME_MESSAGE)
+    return fixed + sum(estimate_tokens(json.dumps(p, default=str)) for p in payload)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="number of past conversations per simulated user")
+    parser.add_argument("--budget", type=int, default=2000, help="session context token budget")
+    parser.add_argument("--repeat", type=int, default=50, help="builds per size for timing")
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'tasks':>6} {'unbounded':>10} {'assembled':>10} {'messages':>9} {'build ms':>9}")
+    for size in args.sizes:
+        db = SimulatedHistory(conversations=size, tasks=max(1, size // 20))
+        builder = SessionContextBuilder(db, token_budget=args.budget, seed_user_data=True)
+
+        begin = time.perf_counter()
+        for _ in range(args.repeat):
+            context = builder.build("bench-user", INSTRUCTION, WELCOME_MESSAGE)
+        build_ms = (time.perf_counter() - begin) * 1000 / args.repeat
+
+        print(f"{size:>8} {len(db.tasks):>6} {unbounded_tokens(db):>10} {context.tokens:>10} "
+              f"{len(context.messages):>9} {build_ms:>9.2f}")
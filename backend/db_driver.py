@@ -1,18 +1,85 @@
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import json
 from datetime import datetime
 import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger("AssistantDatabaseDriver")
 
+
+def parse_lsn(lsn):
+    """Convert a PostgreSQL LSN such as '16/B374D848' to a comparable integer."""
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+class ReplicaPool:
+    """A lazily created, thread-safe pool of autocommit connections to one read replica."""
+
+    def __init__(self, index, dsn, maxconn, connect_timeout):
+        self.index = index
+        self.dsn = dsn
+        self.maxconn = maxconn
+        self.connect_timeout = connect_timeout
+        self.pool = None
+        self.down_until = 0.0
+        self.lock = threading.Lock()
+
+    def available(self, now):
+        return now >= self.down_until
+
+    def getconn(self):
+        """Check out a connection; returns (pool, conn) to hand back to ``putconn``."""
+        with self.lock:
+            if self.pool is None:
+                self.pool = psycopg2.pool.ThreadedConnectionPool(
+                    0, self.maxconn, self.dsn, connect_timeout=self.connect_timeout
+                )
+            pool = self.pool
+        conn = pool.getconn()
+        try:
+            conn.autocommit = True
+        except psycopg2.Error:
+            pool.putconn(conn, close=True)
+            raise
+        return pool, conn
+
+    def putconn(self, pool, conn, broken=False):
+        with self.lock:
+            retired = pool is not self.pool
+        pool.putconn(conn, close=broken or retired)
+
+    def mark_down(self, cooldown):
+        # Retire the pool rather than closing it: connections other threads are
+        # using are closed when they are returned, idle ones when it is collected
+        with self.lock:
+            self.down_until = time.monotonic() + cooldown
+            self.pool = None
+
+    def close(self):
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool:
+            pool.closeall()
+
+
 class AssistantDatabaseDriver:
-    def __init__(self):
-        """Initialize the database connection."""
+    def __init__(self, primary_dsn=None, replica_dsns=None):
+        """
+        Initialize the database connection.
+
+        Writes always go to the primary. When replica DSNs are given (or set in
+        PG_REPLICA_DSNS, separated by ';' since DSNs may contain commas), reads are spread round-robin over the
+        replicas, skipping any that are down or have not yet replayed the last
+        write made for the same user through this driver.
+        """
         self.conn = None
         self.conn_params = {
             "host": os.getenv("PG_HOST", "localhost"),
@@ -21,6 +88,20 @@ class AssistantDatabaseDriver:
             "user": os.getenv("PG_USER", "postgres"),
             "password": os.getenv("PG_PASSWORD", "")
         }
+        primary_dsn = primary_dsn or os.getenv("PG_PRIMARY_DSN")
+        if primary_dsn:
+            self.conn_params = {"dsn": primary_dsn}
+
+        if replica_dsns is None:
+            replica_dsns = [dsn.strip() for dsn in os.getenv("PG_REPLICA_DSNS", "").split(";") if dsn.strip()]
+        pool_size = int(os.getenv("PG_REPLICA_POOL_SIZE", "5"))
+        connect_timeout = int(os.getenv("PG_REPLICA_CONNECT_TIMEOUT", "3"))
+        self.replicas = [ReplicaPool(i, dsn, pool_size, connect_timeout) for i, dsn in enumerate(replica_dsns)]
+        self.replica_cooldown = float(os.getenv("PG_REPLICA_COOLDOWN", "30"))
+        self.next_replica = 0
+        self.replica_lock = threading.Lock()
+        # Last primary WAL position written per user, for read-your-writes on replicas
+        self.write_positions = {}
 
         try:
             self.connect()
@@ -115,13 +196,82 @@ class AssistantDatabaseDriver:
         """Close the database connection."""
         if self.conn:
             self.conn.close()
+        for replica in self.replicas:
+            replica.close()
+
+    def _commit_write(self, user_id):
+        """Commit on the primary and record the WAL position reached for this user."""
+        self.conn.commit()
+        if not self.replicas or user_id is None:
+            return
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT pg_current_wal_lsn()")
+        position = parse_lsn(cursor.fetchone()[0])
+        self.conn.commit()
+        with self.replica_lock:
+            # Concurrent writes may finish out of order; never move a position backwards
+            self.write_positions[user_id] = max(position, self.write_positions.get(user_id, 0))
+
+    def _replica_order(self):
+        """Available replicas, rotated so successive reads start on the next one."""
+        if not self.replicas:
+            return []
+        with self.replica_lock:
+            start = self.next_replica
+            self.next_replica = (start + 1) % len(self.replicas)
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.available(now)]
+
+    def _caught_up(self, conn, required):
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_last_wal_replay_lsn()")
+        replayed = cursor.fetchone()[0]
+        # NULL means the server is not a standby, so it cannot prove it has our write
+        return replayed is not None and parse_lsn(replayed) >= required
+
+    def _mark_down(self, replica, error):
+        logger.warning(f"Replica {replica.index} failed, marking down for {self.replica_cooldown}s: {error}")
+        replica.mark_down(self.replica_cooldown)
+
+    def _read(self, user_id, fetch):
+        """
+        Run a read query on a replica, falling back to the primary.
+
+        Args:
+            user_id: User the read belongs to, used for read-your-writes checks
+            fetch: Callable taking a DictCursor and returning the result
+        """
+        required = self.write_positions.get(user_id)
+        for replica in self._replica_order():
+            try:
+                pool, conn = replica.getconn()
+            except psycopg2.pool.PoolError:
+                # Every connection to this replica is busy; try the next one
+                continue
+            except psycopg2.Error as e:
+                # Unreachable or misconfigured (e.g. an invalid DSN); either way skip it
+                self._mark_down(replica, e)
+                continue
+
+            broken = False
+            try:
+                if required is not None and not self._caught_up(conn, required):
+                    logger.debug(f"Replica {replica.index} behind last write for {user_id}")
+                    continue
+                return fetch(conn.cursor(cursor_factory=psycopg2.extras.DictCursor))
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                broken = True
+                self._mark_down(replica, e)
+            finally:
+                replica.putconn(pool, conn, broken)
 
-    def get_user(self, user_id):
-        """Get user profile by ID."""
         if not self.conn or self.conn.closed:
             self.connect()
+        return fetch(self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor))
 
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    def _fetch_user(self, cursor, user_id):
         cursor.execute("SELECT * FROM user_profiles WHERE user_id = %s", (user_id,))
         user = cursor.fetchone()
 
@@ -129,6 +279,10 @@ class AssistantDatabaseDriver:
             return dict(user)
         return None
 
+    def get_user(self, user_id):
+        """Get user profile by ID."""
+        return self._read(user_id, lambda cursor: self._fetch_user(cursor, user_id))
+
     def create_or_update_user(self, user_id, name=None, preferences=None):
         """Create or update a user profile."""
         if not self.conn or self.conn.closed:
@@ -137,8 +291,8 @@ class AssistantDatabaseDriver:
         cursor = self.conn.cursor()
         current_time = datetime.now()
 
-        # Check if user exists
-        existing_user = self.get_user(user_id)
+        # Check if user exists; read from the primary since we are about to write
+        existing_user = self._fetch_user(self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor), user_id)
 
         if existing_user:
             # Update existing user
@@ -170,8 +324,8 @@ class AssistantDatabaseDriver:
                 (user_id, '{}', '{}', '{}')
             )
 
-        self.conn.commit()
-        return self.get_user(user_id)
+        self._commit_write(user_id)
+        return self._fetch_user(self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor), user_id)
 
     def save_conversation(self, user_id, query, response, context=None):
         """Save a conversation interaction."""
@@ -192,24 +346,23 @@ class AssistantDatabaseDriver:
             (current_time, user_id)
         )
 
-        self.conn.commit()
+        self._commit_write(user_id)
 
     def get_recent_conversations(self, user_id, limit=5):
         """Get recent conversations for a user."""
-        if not self.conn or self.conn.closed:
-            self.connect()
+        def fetch(cursor):
+            cursor.execute(
+                "SELECT timestamp, query, response, context FROM conversations WHERE user_id = %s ORDER BY timestamp DESC LIMIT %s",
+                (user_id, limit)
+            )
 
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cursor.execute(
-            "SELECT timestamp, query, response, context FROM conversations WHERE user_id = %s ORDER BY timestamp DESC LIMIT %s",
-            (user_id, limit)
-        )
+            conversations = []
+            for row in cursor.fetchall():
+                conversations.append(dict(row))
 
-        conversations = []
-        for row in cursor.fetchall():
-            conversations.append(dict(row))
+            return conversations
 
-        return conversations
+        return self._read(user_id, fetch)
 
     def add_task(self, user_id, title, description="", due_date=None, priority="medium", category=None):
         """Add a new task/reminder for a user."""
@@ -224,32 +377,33 @@ class AssistantDatabaseDriver:
         )
 
         task_id = cursor.fetchone()[0]
-        self.conn.commit()
+        self._commit_write(user_id)
         return task_id
 
-    def get_pending_tasks(self, user_id, category=None):
-        """Get all pending tasks for a user, optionally filtered by category."""
-        if not self.conn or self.conn.closed:
-            self.connect()
+    def get_pending_tasks(self, user_id, category=None, limit=None):
+        """Get pending tasks for a user, highest priority and soonest due first, optionally filtered by category."""
+        # LIMIT NULL means no limit in PostgreSQL
+        order = "ORDER BY CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 WHEN 'low' THEN 2 ELSE 1 END, due_date LIMIT %s"
 
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        def fetch(cursor):
+            if category:
+                cursor.execute(
+                    "SELECT id, title, description, due_date, priority, category FROM tasks WHERE user_id = %s AND completed = FALSE AND category = %s " + order,
+                    (user_id, category, limit)
+                )
+            else:
+                cursor.execute(
+                    "SELECT id, title, description, due_date, priority, category FROM tasks WHERE user_id = %s AND completed = FALSE " + order,
+                    (user_id, limit)
+                )
 
-        if category:
-            cursor.execute(
-                "SELECT id, title, description, due_date, priority, category FROM tasks WHERE user_id = %s AND completed = FALSE AND category = %s ORDER BY due_date, priority",
-                (user_id, category)
-            )
-        else:
-            cursor.execute(
-                "SELECT id, title, description, due_date, priority, category FROM tasks WHERE user_id = %s AND completed = FALSE ORDER BY due_date, priority",
-                (user_id,)
-            )
+            tasks = []
+            for row in cursor.fetchall():
+                tasks.append(dict(row))
 
-        tasks = []
-        for row in cursor.fetchall():
-            tasks.append(dict(row))
+            return tasks
 
-        return tasks
+        return self._read(user_id, fetch)
 
     def complete_task(self, task_id):
         """Mark a task as completed."""
@@ -258,12 +412,13 @@ class AssistantDatabaseDriver:
 
         cursor = self.conn.cursor()
         cursor.execute(
-            "UPDATE tasks SET completed = TRUE WHERE id = %s",
+            "UPDATE tasks SET completed = TRUE WHERE id = %s RETURNING user_id",
             (task_id,)
         )
 
-        self.conn.commit()
-        return cursor.rowcount > 0
+        row = cursor.fetchone()
+        self._commit_write(row[0] if row else None)
+        return row is not None
 
     def add_contact(self, user_id, name, phone=None, email=None, relationship=None, notes=None):
         """Add a new contact for a user."""
@@ -278,33 +433,31 @@ class AssistantDatabaseDriver:
         )
 
         contact_id = cursor.fetchone()[0]
-        self.conn.commit()
+        self._commit_write(user_id)
         return contact_id
 
     def get_contacts(self, user_id, name_filter=None):
         """Get all contacts for a user, optionally filtered by name."""
-        if not self.conn or self.conn.closed:
-            self.connect()
-
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
-        if name_filter:
-            # Using ILIKE for case-insensitive partial matching
-            cursor.execute(
-                "SELECT id, name, phone, email, relationship, notes FROM contacts WHERE user_id = %s AND name ILIKE %s",
-                (user_id, f"%{name_filter}%")
-            )
-        else:
-            cursor.execute(
-                "SELECT id, name, phone, email, relationship, notes FROM contacts WHERE user_id = %s",
-                (user_id,)
-            )
-
-        contacts = []
-        for row in cursor.fetchall():
-            contacts.append(dict(row))
-
-        return contacts
+        def fetch(cursor):
+            if name_filter:
+                # Using ILIKE for case-insensitive partial matching
+                cursor.execute(
+                    "SELECT id, name, phone, email, relationship, notes FROM contacts WHERE user_id = %s AND name ILIKE %s",
+                    (user_id, f"%{name_filter}%")
+                )
+            else:
+                cursor.execute(
+                    "SELECT id, name, phone, email, relationship, notes FROM contacts WHERE user_id = %s",
+                    (user_id,)
+                )
+
+            contacts = []
+            for row in cursor.fetchall():
+                contacts.append(dict(row))
+
+            return contacts
+
+        return self._read(user_id, fetch)
 
     def update_user_settings(self, user_id, setting_type, settings):
         """Update user settings (voice, notification, or privacy)."""
@@ -331,15 +484,14 @@ class AssistantDatabaseDriver:
             (json.dumps(settings), user_id)
         )
 
-        self.conn.commit()
+        self._commit_write(user_id)
 
     def get_user_settings(self, user_id):
         """Get all settings for a user."""
-        if not self.conn or self.conn.closed:
-            self.connect()
+        def fetch(cursor):
+            cursor.execute("SELECT * FROM user_settings WHERE user_id = %s", (user_id,))
 
-        cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cursor.execute("SELECT * FROM user_settings WHERE user_id = %s", (user_id,))
+            settings = cursor.fetchone()
+            return dict(settings) if settings else None
 
-        settings = cursor.fetchone()
-        return dict(settings) if settings else None
+        return self._read(user_id, fetch)
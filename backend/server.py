@@ -1,16 +1,25 @@
 
 import os
 from livekit import api
-from flask import Flask, request
+from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from livekit.api import LiveKitAPI, ListRoomsRequest
+from admission import TokenRateLimiter
+import math
 import uuid
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
+rate_limiter = TokenRateLimiter.from_env()
+
+# Behind a reverse proxy, trust this many X-Forwarded-For hops so remote_addr is the real client
+proxy_hops = int(os.getenv("PROXY_FIX_HOPS", "0"))
+if proxy_hops:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
 
 async def generate_room_name():
     name = "room-" + str(uuid.uuid4())[:8]
@@ -27,9 +36,21 @@ async def get_rooms():
 
 @app.route("/getToken")
 async def getToken():
-    name = request.args.get("name", "my name")
+    name = request.args.get("name")
     room = request.args.get("room", None)
 
+    if not name:
+        return jsonify({"error": "Missing required parameter: name"}), 400
+
+    allowed, retry_after, reason = rate_limiter.check(name, request.remote_addr)
+    if not allowed:
+        retry_after = max(1, math.ceil(retry_after))
+        return (
+            jsonify({"error": "Too many requests", "limit": reason, "retry_after": retry_after}),
+            429,
+            {"Retry-After": str(retry_after)}
+        )
+
     if not room:
         room = await generate_room_name()
 
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("SessionContext")
+
+# Rough per-message cost of role and framing in the realtime conversation
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate, about 4 characters per token for English text."""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Clip ``text`` to roughly ``max_tokens`` tokens."""
+    if max_tokens <= 0:
+        return ""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - 3)].rstrip() + "..."
+
+
+def _to_json(value):
+    return json.dumps(value or {}, default=str, separators=(",", ":"))
+
+
+class SessionContext:
+    """Instructions and seeded conversation messages for one realtime session."""
+
+    def __init__(self, instructions, messages, tokens):
+        self.instructions = instructions
+        # List of (role, content) tuples, oldest first
+        self.messages = messages
+        self.tokens = tokens
+
+
+class SessionContextBuilder:
+    """
+    Build the realtime session's instructions and seeded history under a token budget.
+
+    Content is added in priority order (profile, settings, pending tasks, then
+    conversation history from newest to oldest) until the budget runs out, and
+    each entry is clipped to ``max_entry_tokens`` so one long record cannot
+    crowd out the rest. Pending tasks may use at most ``task_share`` of the
+    budget so recent history is not starved by a long task list. At most
+    ``task_limit`` tasks (highest priority first) and ``history_limit``
+    conversations are fetched, so both the token count and the build time stay
+    flat however many tasks and conversations a user has.
+
+    The user id is the client-chosen participant identity, not an authenticated
+    one, so seeding user data is opt-in (``seed_user_data`` /
+    SESSION_SEED_USER_DATA). When it is off only the base instructions and the
+    greeting are used and no user data is loaded.
+    """
+
+    def __init__(self, db, token_budget=None, history_limit=None, max_entry_tokens=None, task_share=0.4,
+                 seed_user_data=None, task_limit=None):
+        self.db = db
+        if seed_user_data is None:
+            seed_user_data = os.getenv("SESSION_SEED_USER_DATA", "false").lower() in ("1", "true", "yes")
+        if token_budget is None:
+            token_budget = int(os.getenv("SESSION_CONTEXT_TOKENS", "2000"))
+        if history_limit is None:
+            history_limit = int(os.getenv("SESSION_HISTORY_LIMIT", "20"))
+        if task_limit is None:
+            task_limit = int(os.getenv("SESSION_TASK_LIMIT", "20"))
+        if max_entry_tokens is None:
+            max_entry_tokens = int(os.getenv("SESSION_ENTRY_TOKENS", "150"))
+        self.token_budget = token_budget
+        self.history_limit = history_limit
+        self.task_limit = task_limit
+        self.max_entry_tokens = max_entry_tokens
+        self.task_share = task_share
+        self.seed_user_data = seed_user_data
+
+    def build(self, user_id, base_instructions, greeting=None):
+        """
+        Assemble the session context for a user.
+
+        Args:
+            user_id: Unique identifier for the user
+            base_instructions: System prompt that is always included in full
+            greeting: Optional assistant message seeded last, always included and counted in the budget
+
+        Returns:
+            SessionContext with the final instructions, seed messages and estimated token count
+        """
+        closing = [("assistant", greeting)] if greeting else []
+        closing_cost = sum(estimate_tokens(c) + MESSAGE_OVERHEAD_TOKENS for _, c in closing)
+        if not self.seed_user_data:
+            return SessionContext(base_instructions, closing, estimate_tokens(base_instructions) + closing_cost)
+
+        header = f"{base_instructions}\n\nThe current user's user_id is {user_id}."
+        fixed_cost = estimate_tokens(header) + closing_cost
+        remaining = self.token_budget - fixed_cost
+
+        try:
+            user = self.db.get_user(user_id)
+            settings = self.db.get_user_settings(user_id)
+            tasks = self.db.get_pending_tasks(user_id, limit=self.task_limit)
+            conversations = self.db.get_recent_conversations(user_id, self.history_limit)
+        except Exception as e:
+            logger.error(f"Failed to load session context for {user_id}: {e}")
+            return SessionContext(header, closing, fixed_cost)
+
+        sections = []
+        for title, lines, cap in (
+            ("User profile", self._profile_lines(user), None),
+            ("User settings", self._settings_lines(settings), None),
+            ("Pending tasks", self._task_lines(tasks), int(self.token_budget * self.task_share)),
+        ):
+            kept, remaining = self._fit(title, lines, remaining, cap)
+            if kept:
+                sections.append(kept)
+
+        messages, remaining = self._fit_history(conversations, remaining)
+        messages += closing
+
+        instructions = "\n\n".join([header] + sections)
+        tokens = self.token_budget - remaining
+        logger.info(f"Session context for {user_id}: ~{tokens} tokens, {len(messages)} history messages")
+        return SessionContext(instructions, messages, tokens)
+
+    def _profile_lines(self, user):
+        if not user:
+            return []
+        lines = []
+        if user.get("name"):
+            lines.append(f"Name: {user['name']}")
+        if user.get("preferences"):
+            lines.append(f"Preferences: {_to_json(user['preferences'])}")
+        if user.get("last_interaction"):
+            lines.append(f"Last interaction: {user['last_interaction']}")
+        return lines
+
+    def _settings_lines(self, settings):
+        if not settings:
+            return []
+        return [
+            f"{key}: {_to_json(settings[key])}"
+            for key in ("voice_settings", "notification_preferences", "privacy_settings")
+            if settings.get(key)
+        ]
+
+    def _task_lines(self, tasks):
+        # Already ordered by priority then due date by the database
+        lines = []
+        for task in tasks or []:
+            line = f"- [{task.get('priority')}] {task.get('title')} (id {task.get('id')}"
+            if task.get("due_date"):
+                line += f", due {task['due_date']}"
+            line += ")"
+            if task.get("description"):
+                line += f": {task['description']}"
+            lines.append(line)
+        return lines
+
+    def _fit(self, title, lines, remaining, cap=None):
+        """Keep leading ``lines`` of a section while they fit; returns (text, remaining)."""
+        available = remaining if cap is None else min(remaining, cap)
+        cost = estimate_tokens(f"\n\n{title}:")
+        kept = []
+        for line in lines:
+            line = truncate_to_tokens(line, self.max_entry_tokens)
+            if not line:
+                continue
+            line_cost = estimate_tokens(line) + 1
+            if cost + line_cost > available:
+                break
+            kept.append(line)
+            cost += line_cost
+        if not kept:
+            return None, remaining
+        return f"{title}:\n" + "\n".join(kept), remaining - cost
+
+    def _fit_history(self, conversations, remaining):
+        """Seed the newest conversation turns that fit, returned oldest first."""
+        messages = []
+        for convo in conversations or []:
+            # Newest first, so the response comes before its query until the final reverse
+            turn = [
+                (role, truncate_to_tokens(convo.get(key) or "", self.max_entry_tokens))
+                for role, key in (("assistant", "response"), ("user", "query"))
+            ]
+            turn = [(role, content) for role, content in turn if content]
+            if not turn:
+                continue
+            cost = sum(estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS for _, content in turn)
+            if cost > remaining:
+                break
+            messages.extend(turn)
+            remaining -= cost
+        messages.reverse()
+        return messages, remaining
@@ -0,0 +1,73 @@
+import copy
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger("SingleFlight")
+
+
+class _Call:
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical read calls into a single execution.
+
+    Callers that ask for the same key while a call is already in flight wait
+    for that call and receive a copy of its result instead of issuing their
+    own query. Writes go through ``fence()``, which bumps a generation counter
+    so that reads starting after a write never join a read that started
+    before it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._generation = 0
+
+    def do(self, key, fn):
+        """Run ``fn`` for ``key``, sharing the result with concurrent callers."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.generation == self._generation:
+                leader = False
+            else:
+                call = _Call(self._generation)
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            logger.debug(f"Coalesced call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    @contextmanager
+    def fence(self):
+        """Mark a write so that in-flight reads are not shared past it."""
+        self._bump()
+        try:
+            yield
+        finally:
+            self._bump()
+
+    def _bump(self):
+        with self._lock:
+            self._generation += 1
@@ -0,0 +1,131 @@
+"""
+Spike-test harness for token issuance admission control.
+
+Simulated mode (default) replays a traffic spike against a shared backend with
+fixed capacity, once without admission control and once through
+TokenRateLimiter, and prints latency percentiles for served requests:
+
+    python spike_test.py --requests 1000 --duration 1.0
+
+HTTP mode fires the same spike at a running server.py instead:
+
+    python spike_test.py --url http://localhost:5001/getToken --requests 300
+
+All HTTP-mode requests come from one address, so the per-address limit
+(TOKEN_RATE_PER_ADDRESS / TOKEN_BURST_PER_ADDRESS) applies to the whole spike.
+"""
+import argparse
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from admission import TokenRateLimiter
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_spike(handler, requests, duration, identities, workers):
+    """Issue ``requests`` evenly over ``duration`` seconds; collect (status, latency)."""
+    results = []
+    results_lock = threading.Lock()
+
+    def fire(identity):
+        start = time.perf_counter()
+        status = handler(identity)
+        latency = time.perf_counter() - start
+        with results_lock:
+            results.append((status, latency))
+
+    interval = duration / requests
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(requests):
+            delay = begin + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, f"user-{random.randrange(identities)}")
+    return results
+
+
+def report(label, results):
+    served = [latency for status, latency in results if status == 200]
+    rejected = [latency for status, latency in results if status == 429]
+    print(f"{label}")
+    print(f"  served:   {len(served):5d}  p50={percentile(served, 50) * 1000:8.1f}ms  "
+          f"p99={percentile(served, 99) * 1000:8.1f}ms  max={max(served, default=0) * 1000:8.1f}ms")
+    print(f"  rejected: {len(rejected):5d}  p99={percentile(rejected, 99) * 1000:8.1f}ms")
+
+
+def simulated(args):
+    backend = threading.Semaphore(args.capacity)
+
+    def serve():
+        with backend:
+            time.sleep(args.service_ms / 1000.0)
+        return 200
+
+    def unlimited(identity):
+        return serve()
+
+    limiter = TokenRateLimiter(
+        identity_rate=args.identity_rate,
+        identity_burst=args.identity_burst,
+        global_rate=args.global_rate,
+        global_burst=args.global_burst,
+    )
+
+    def limited(identity):
+        allowed, _, _ = limiter.check(identity)
+        if not allowed:
+            return 429
+        return serve()
+
+    capacity = args.capacity * 1000.0 / args.service_ms
+    print(f"Backend capacity ~{capacity:.0f} req/s, spike {args.requests / args.duration:.0f} req/s "
+          f"from {args.identities} identities\n")
+    report("Without admission control", run_spike(unlimited, args.requests, args.duration, args.identities, args.workers))
+    report("With admission control", run_spike(limited, args.requests, args.duration, args.identities, args.workers))
+
+
+def http(args):
+    def call(identity):
+        query = urllib.parse.urlencode({"name": identity, "room": "spike-test"})
+        try:
+            with urllib.request.urlopen(f"{args.url}?{query}", timeout=30) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except urllib.error.URLError:
+            return 0
+
+    report(f"HTTP spike against {args.url}", run_spike(call, args.requests, args.duration, args.identities, args.workers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="getToken URL of a running server; omit for simulated mode")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=1.0, help="spike length in seconds")
+    parser.add_argument("--identities", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=256)
+    parser.add_argument("--capacity", type=int, default=4, help="simulated backend concurrency")
+    parser.add_argument("--service-ms", type=float, default=20.0, help="simulated backend service time")
+    parser.add_argument("--identity-rate", type=float, default=0.2)
+    parser.add_argument("--identity-burst", type=float, default=3)
+    parser.add_argument("--global-rate", type=float, default=150)
+    parser.add_argument("--global-burst", type=float, default=20)
+    args = parser.parse_args()
+
+    if args.url:
+        http(args)
+    else:
+        simulated(args)
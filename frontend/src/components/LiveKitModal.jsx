@@ -13,6 +13,12 @@ const LiveKitModal = ({ setShowSupport }) => {
       const response = await fetch(
         `/api/getToken?name=${encodeURIComponent(userName)}`,
       );
+      if (!response.ok) {
+        const retryAfter = response.headers.get("Retry-After");
+        throw new Error(
+          `Token request failed (${response.status}), retry after ${retryAfter ?? "?"}s`,
+        );
+      }
       const token = await response.text();
       setToken(token);
       setIsSubmittingName(false);